@@ -1,37 +1,117 @@
 import os
-import copy
+import sys
 import json
 import pygame
 import argparse
+from types import MappingProxyType
+from functools import lru_cache
+from collections import Counter
 from game_logic import *
 
+# Interned, as are the names and keys read from JSON, so comparisons and lookups hit the identity fast path
+# Interned, along with the names and keys read from the building JSON, so comparisons and lookups hit the identity fast path
+TOWNHALL: str = sys.intern('townhall')
+ARMY_CAMP: str = sys.intern('army camp')
+
+MAX_COUNT_KEYS: tuple[str, ...] = (
+    sys.intern('max number of resource'),
+    sys.intern('max number of army'),
+    sys.intern('max number of defense'),
+    sys.intern('max number of traps')
+)
+MAX_LEVEL_KEYS: tuple[str, ...] = (
+    sys.intern('max level of resource'),
+    sys.intern('max level of army'),
+    sys.intern('max level of defense'),
+    sys.intern('max level of traps')
+)
+
+
+@lru_cache(maxsize=None)
+def load_building(building_name: str) -> dict:
+    """
+    Load the building data from disk, cached so each building file is only read once
+
+    :param building_name: The name of the building
+    :return dict: The building data, with the per level data also keyed by int under 'by level'
+    """
+
+    with open(f".{os.sep}data{os.sep}structures{os.sep}{building_name.replace(' ', '_')}.json") as file:
+        # Intern every key so building names and cap keys are the same objects as the constants above
+        building_data: dict = json.load(file, object_pairs_hook=lambda pairs: {sys.intern(key): value for key, value in pairs})
+
+    # JSON forces string keys, convert the levels once so lookups don't need str() every time
+    building_data['by level'] = {int(key): value for key, value in building_data.items() if key.isdigit()}
+
+    return building_data
+
+
+@lru_cache(maxsize=None)
+def get_townhall_caps(townhall_level: int) -> tuple[MappingProxyType, MappingProxyType, frozenset[str]]:
+    """
+    Combine the townhall's resource, army, defense and trap caps, cached since they only depend on the level
+
+    :param townhall_level: The level of the townhall
+    :return tuple[MappingProxyType, MappingProxyType, frozenset[str]]: Read only max counts and max levels, and the allowed building names
+    """
+
+    townhall: dict = load_building(TOWNHALL)['by level'][townhall_level]
+
+    # Combine the dictionaries, update() sums counts and unlike Counter addition keeps zero entries
+    max_combined_count: Counter = Counter()
+    for key in MAX_COUNT_KEYS:
+        max_combined_count.update(townhall.get(key))
+
+    max_combined_level: Counter = Counter()
+    for key in MAX_LEVEL_KEYS:
+        max_combined_level.update(townhall.get(key))
+
+    allowed_buildings: frozenset[str] = frozenset(max_combined_count) | {TOWNHALL}
 
-def validate_village(buildings: dict, building_cache: dict) -> bool:
+    # The same objects are handed to every caller, so don't let anyone modify the cached caps
+    return MappingProxyType(max_combined_count), MappingProxyType(max_combined_level), allowed_buildings
+
+
+def validate_village(buildings: dict) -> bool:
     """
     Validate the village data
 
     :param buildings: The list of buildings in the village
-    :param building_cache: The cache of building data
     :return bool: True if the village is valid, False otherwise
     """
 
     valid: bool = True
     warnings: list[str] = []
 
-    # Get the townhall building
-    townhall: dict | None = None
-    previous_townhall: dict | None = None
+    # Get the townhall level
+    townhall_level: int | None = None
     current_buildings: dict = {}
+    tile_owners: dict[tuple[int, int], str] = {}
 
-    for building in buildings.values():
+    for building_id, building in buildings.items():
         building_name: str = building.get("name")
         building_level: int = int(building.get("level"))
+        position: list[int] = building.get("position")
+        size: dict = building.get("size")
+
+        # Check every tile the building covers against the ones already taken, remembering who took them
+        overlapped_ids: list[str] = []
+        for x in range(position[0], position[0] + size.get('width')):
+            for y in range(position[1], position[1] + size.get('height')):
+                owner_id: str | None = tile_owners.get((x, y))
+
+                if owner_id is None:
+                    tile_owners[(x, y)] = building_id
+                elif owner_id not in overlapped_ids:
+                    overlapped_ids.append(owner_id)
+
+        # One warning per pair of overlapping buildings, not per tile
+        for owner_id in overlapped_ids:
+            warnings.append(f"Building {building_id} overlaps {owner_id}")
+            valid = False
 
-        if building_name == 'townhall':
-            townhall = building
-        
-            if 'townhall' in building_cache and building_level > 1:
-                previous_townhall = building_cache['townhall'][str(building_level - 1)]
+        if building_name == TOWNHALL:
+            townhall_level = building_level
             
         if building_name not in current_buildings:
             current_buildings[building_name] = [building_level]
@@ -39,77 +119,57 @@ def validate_village(buildings: dict, building_cache: dict) -> bool:
             current_buildings[building_name].append(building_level)
 
     
-    if townhall is None:
+    if townhall_level is None:
         print("No townhall found, unable to validate village!")
         return False
     
-    max_resources_count: dict = townhall.get('max number of resource')
-    max_resources_level: dict = townhall.get('max level of resource')
-    max_army_count: dict = townhall.get('max number of army')
-    max_army_level: dict = townhall.get('max level of army')
-    max_defense_count: dict = townhall.get('max number of defense')
-    max_defense_level: dict = townhall.get('max level of defense')
-    max_trap_count: dict = townhall.get('max number of traps')
-    max_trap_level: dict = townhall.get('max level of traps')
-
-    # Combine the dictionaries
-    max_combined_count: dict = {}
-    for d in [max_resources_count, max_army_count, max_defense_count, max_trap_count]:
-        for key, value in d.items():
-            max_combined_count[key] = max_combined_count.get(key, 0) + value
+    max_combined_count, max_combined_level, allowed_buildings = get_townhall_caps(townhall_level)
     
-    max_combined_level: dict = {}
-    for d in [max_resources_level, max_army_level, max_defense_level, max_trap_level]:
-        for key, value in d.items():
-            max_combined_level[key] = max_combined_level.get(key, 0) + value
-    
-    for building_name in current_buildings:
-        if building_name not in max_combined_count.keys() and building_name != 'townhall':
+    for building_name, levels in current_buildings.items():
+        if building_name not in allowed_buildings:
             warnings.append(f"Building {building_name} not found in townhall")
+            warnings.append(f"Building {building_name} count not found")
             valid = False
-        
-        if max_combined_count.get(building_name) is None:
-            if building_name != 'townhall':
-                warnings.append(f"Building {building_name} count not found")
+            continue
+
+        allowed_count: int | None = max_combined_count.get(building_name)
+        allowed_level: int | None = max_combined_level.get(building_name)
+
+        # The townhall itself has no cap
+        if allowed_count is None:
             continue
         
         # Check the count
-        if len(current_buildings.get(building_name)) > max_combined_count.get(building_name):
+        if len(levels) > allowed_count:
             warnings.append(f"Building {building_name} count is more than allowed")
             valid = False
 
         # Check the level
-        if max_combined_level.get(building_name) is None:
+        if allowed_level is None:
             warnings.append(f"Building {building_name} level not found")
             continue
 
-        if max(current_buildings.get(building_name)) > max_combined_level.get(building_name):
+        if max(levels) > allowed_level:
             warnings.append(f"Building {building_name} level is more than allowed")
             valid = False
         
-    if previous_townhall is None:
+    if townhall_level <= 1:
         for warning in warnings:
             print(f'[!] {warning}')
         return valid
     
-    min_resources_count: dict = previous_townhall.get('max number of resource')
-    min_army_count: dict = previous_townhall.get('max number of army')
-    min_defense_count: dict = previous_townhall.get('max number of defense')
-    min_trap_count: dict = previous_townhall.get('max number of traps')
-
-    # Combine the dictionaries
-    min_combined_count: dict = {}
-    for d in [min_resources_count, min_army_count, min_defense_count, min_trap_count]:
-        for key, value in d.items():
-            min_combined_count[key] = min_combined_count.get(key, 0) + value
-
-    for min_building in min_combined_count.keys():
-        if min_building not in current_buildings:
+    # Everything the previous townhall allowed has to be built before upgrading
+    min_combined_count: MappingProxyType = get_townhall_caps(townhall_level - 1)[0]
+
+    for min_building, required_count in min_combined_count.items():
+        levels: list[int] | None = current_buildings.get(min_building)
+
+        if levels is None:
             warnings.append(f"Building {min_building} not found")
             valid = False
             continue
 
-        if min_combined_count.get(min_building) > len(current_buildings.get(min_building)):
+        if required_count > len(levels):
             warnings.append(f"Building {min_building} count is less than required")
             valid = False
     
@@ -119,12 +179,11 @@ def validate_village(buildings: dict, building_cache: dict) -> bool:
     return valid
 
 
-def generate_structures_info(buildings: list[dict], building_cache: dict, cell_size: int) -> dict:
+def generate_structures_info(buildings: list[dict], cell_size: int) -> dict:
     """
     Generate the structures from the buildings in the village
 
     :param buildings: The list of buildings in the village
-    :param building_cache: The cache of building data
     :param cell_size: The size of each cell in the grid
     :return dict: The list of structures
     """
@@ -133,57 +192,60 @@ def generate_structures_info(buildings: list[dict], building_cache: dict, cell_s
     ids: dict = {}
 
     for building in buildings:
-        building_name: str = building.get("type")
-        building_level: str = str(building.get("level"))
+        building_name: str = sys.intern(building.get("type"))
+        building_level: int = int(building.get("level"))
 
-        if building_name not in building_cache:
-            building_data: dict = json.load(open(f".{os.sep}data{os.sep}structures{os.sep}{building_name.replace(' ', '_')}.json"))
-            building_cache[building_name] = building_data
+        # Look everything up once per building rather than once per position
+        building_data: dict = load_building(building_name)
+        level_data: dict = building_data['by level'][building_level]
 
-        building_size: dict = building_cache[building_name].get("size")
-        building_inset: float = building_cache[building_name].get("inset")
-        building_type: str = building_cache[building_name].get("type")
+        building_size: dict = building_data.get("size")
+        building_inset: float = building_data.get("inset")
+        building_type: str = building_data.get("type")
+        building_width: int = building_size.get('width')
+        building_height: int = building_size.get('height')
 
         # Check if the building has only one position, if so then make a list of one position
-        if building_cache[building_name].get("max count") == 1:
+        if building_data.get("max count") == 1:
             building_positions: list[list[int]] = [[building.get("x"), building.get("y")]]
         else:
             building_positions: list[list[int]] = building.get('positions')
 
 
-        for position in building_positions:
-            structure: dict = copy.deepcopy(building_cache[building_name][building_level])
+        # WAY more optimized to generate center once, rather than every frame
+        # The offset from the corner to the center only depends on the size, so work it out once per building
+        center_offset_x: int = (building_width // 2) * cell_size
+        center_offset_y: int = (building_height // 2) * cell_size
 
-            # WAY more optimized to generate center once, rather than every frame
-            # Calculate the center position of the structure
-            center_x: int = (position[0] + building_size.get('width') // 2) * cell_size
-            center_y: int = (position[1] + building_size.get('height') // 2) * cell_size
+        # Adjust center position for odd-sized structures
+        if building_width % 2 != 0:
+            center_offset_x += cell_size // 2
+        if building_height % 2 != 0:
+            center_offset_y += cell_size // 2
 
-            # Adjust center position for odd-sized structures
-            if building_size.get('width') % 2 != 0:
-                center_x += cell_size // 2
-            if building_size.get('height') % 2 != 0:
-                center_y += cell_size // 2
+        for position in building_positions:
+            # Only top level keys get assigned, so a shallow copy of the level data is enough
+            structure: dict = level_data.copy()
 
             structure.update({
                 'level': building_level,
                 'name': building_name,
                 'type': building_type,
                 'position': position,
-                'center': [center_x, center_y],
+                'center': [position[0] * cell_size + center_offset_x, position[1] * cell_size + center_offset_y],
                 'size': building_size,
                 'inset': building_inset
             })
 
             if building_type == 'defense':
                 structure.update({
-                    'range': building_cache[building_name].get('range'),
-                    'attack speed': building_cache[building_name].get('attack speed'),
-                    'targets': building_cache[building_name].get('targets'),
-                    'targets count': building_cache[building_name].get('targets count')
+                    'range': building_data.get('range'),
+                    'attack speed': building_data.get('attack speed'),
+                    'targets': building_data.get('targets'),
+                    'targets count': building_data.get('targets count')
                 })
             
-            if building_name == 'army camp':
+            if building_name == ARMY_CAMP:
                 structure['troops'] = building.get('troops')
 
             if building_name not in ids:
@@ -198,62 +260,90 @@ def generate_structures_info(buildings: list[dict], building_cache: dict, cell_s
     return structures
 
 
-def draw_grid(window: pygame.surface, cell_size: int, num_rows: int, num_cols: int) -> None:
+def generate_grid_surface(cell_size: int, num_rows: int, num_cols: int) -> pygame.surface:
     """
-    Draw the grid on the window
+    Pre-render the grid onto a background surface, the grid never changes so this only needs to happen once
 
-    :param window: The window to draw the grid on
     :param cell_size: The size of each cell in the grid
     :param num_rows: The number of rows in the grid
     :param num_cols: The number of columns in the grid
-    :return None:
+    :return pygame.surface: The rendered grid
     """
 
-    # Clear the window
-    window.fill((255, 255, 255))
+    background: pygame.surface = pygame.Surface((num_cols * cell_size, num_rows * cell_size))
+    background.fill((255, 255, 255))
 
     for row in range(num_rows):
         for col in range(num_cols):
-            pygame.draw.rect(window, (0, 0, 0), (col * cell_size, row * cell_size, cell_size, cell_size), 1)
+            pygame.draw.rect(background, (0, 0, 0), (col * cell_size, row * cell_size, cell_size, cell_size), 1)
 
+    # Match the display pixel format so blitting is a straight copy
+    return background.convert()
 
-def draw_structures(window: pygame.surface, cell_size: int, structures: dict, building_colors: dict) -> None:
+
+def generate_structure_surfaces(structures: dict, cell_size: int, building_colors: dict, view_rect: pygame.Rect) -> None:
     """
-    Draw the structures on the window
+    Pre-render each structure onto its own surface, structures are static so this only needs to happen once
 
-    :param window: The window to draw the structures on
+    :param structures: The list of structures to render
     :param cell_size: The size of each cell in the grid
-    :param structures: The list of structures to draw
     :param building_colors: The colors of the buildings
+    :param view_rect: The visible area in pixels, structures outside of it are never rendered
     :return None:
     """
 
+    font: pygame.font = pygame.font.Font(None, 20)
+
+    # Structures of the same building and level look identical, so they share one surface
+    surfaces: dict[tuple[str, int], pygame.surface] = {}
+
     for structure in structures.values():
         if structure is None:
             continue
-            
+
         position: list[int] = structure.get("position")
         size: dict = structure.get("size")
-        center: list[int] = structure.get("center")
 
-        # Draw the structure
-        for row in range(size.get('width')):
-            for col in range(size.get('height')):
-                x: int = (position[0] + col) * cell_size
-                y: int = (position[1] + row) * cell_size
+        # Keep where the surface goes alongside it so drawing needs no per-structure math
+        rect: pygame.Rect = pygame.Rect(position[0] * cell_size, position[1] * cell_size, size.get('width') * cell_size, size.get('height') * cell_size)
+
+        # Skip anything off the grid so its surface is never rendered
+        if not view_rect.colliderect(rect):
+            continue
 
-                # Use building color
-                if structure.get('name') in building_colors:
-                    pygame.draw.rect(window, building_colors[structure.get('name')], (x, y, cell_size, cell_size))
-                else:
-                    pygame.draw.rect(window, (0, 0, 0), (x, y, cell_size, cell_size))
+        surface_key: tuple[str, int] = (structure.get('name'), structure.get('level'))
+        surface: pygame.surface | None = surfaces.get(surface_key)
 
-        # Draw level in the middle
-        level: int = structure.get('level')
-        font: pygame.font = pygame.font.Font(None, 20)
-        text = font.render(str(level), True, (0, 0, 0))
-        text_rect = text.get_rect(center=(center[0], center[1]))
-        window.blit(text, text_rect)
+        if surface is None:
+            surface = pygame.Surface(rect.size)
+            surface.fill(building_colors.get(structure.get('name'), (0, 0, 0)))
+
+            # Draw level in the middle
+            text = font.render(str(structure.get('level')), True, (0, 0, 0))
+            text_rect = text.get_rect(center=surface.get_rect().center)
+            surface.blit(text, text_rect)
+
+            surfaces[surface_key] = surface
+
+        structure['rect'] = rect
+        structure['surface'] = surface
+
+
+def draw_structures(surface: pygame.surface, structures: dict) -> None:
+    """
+    Draw the structures on a surface
+
+    :param surface: The surface to draw the structures on
+    :param structures: The list of structures to draw
+    :return None:
+    """
+
+    # Hand every blit to pygame in one call rather than one call per structure, off grid structures have no surface
+    surface.blits([
+        (structure.get('surface'), structure.get('rect'))
+        for structure in structures.values()
+        if structure is not None and structure.get('surface') is not None
+    ], doreturn=False)
 
 
 def main(cell_size: int, num_rows: int, num_cols: int, fps: int, village: dict, building_colors: dict) -> None:
@@ -263,6 +353,7 @@ def main(cell_size: int, num_rows: int, num_cols: int, fps: int, village: dict,
     :param cell_size: The size of each cell in the grid
     :param num_rows: The number of rows in the grid
     :param num_cols: The number of columns in the grid
+    :param fps: The frame rate, reserved for the simulation loop as the static view only redraws on expose
     :param village: The village data
     :param building_colors: The colors of the buildings
     :return None:
@@ -280,33 +371,44 @@ def main(cell_size: int, num_rows: int, num_cols: int, fps: int, village: dict,
     window: pygame.surface = pygame.display.set_mode((window_width, window_height))
     pygame.display.set_caption("Grid Window")
 
-    clock: pygame.time.Clock = pygame.time.Clock()
-    
+    view_rect: pygame.Rect = pygame.Rect(0, 0, window_width, window_height)
+    background: pygame.surface = generate_grid_surface(cell_size, num_rows, num_cols)
+
     buildings: list[dict] | list = village.get("buildings", [])
-    building_cache: dict = {}
     
-    structures: dict = generate_structures_info(buildings, building_cache, cell_size)
-    valide_villate: bool = validate_village(structures, building_cache)
+    structures: dict = generate_structures_info(buildings, cell_size)
+    generate_structure_surfaces(structures, cell_size, building_colors, view_rect)
+
+    # Structures are static, so bake them into the background along with the grid
+    draw_structures(background, structures)
+
+    valide_villate: bool = validate_village(structures)
 
     if not valide_villate:
         print("Invalid village")
     else:
         print("Valid village")
 
+    # Draw the first frame, after that nothing changes until the window needs repainting
+    window.blit(background, (0, 0))
+    pygame.display.flip()
+
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return None
+        # Block until something happens rather than redrawing a static scene every tick
+        event: pygame.event.Event = pygame.event.wait()
+
+        if event.type == pygame.QUIT:
+            return None
+
+        # VIDEOEXPOSE is raised alongside WINDOWEXPOSED, so only listen for the window events to repaint once
+        if event.type not in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            continue
+
+        window.blit(background, (0, 0))
 
-        draw_grid(window, cell_size, num_rows, num_cols)
-        draw_structures(window, cell_size, structures, building_colors)
-                    
         # Update the display
         pygame.display.flip()
 
-        # Limit the frame rate
-        clock.tick(fps)
-
 
 if __name__ == "__main__":
     # Load the configuration file